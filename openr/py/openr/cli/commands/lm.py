@@ -7,11 +7,17 @@
 # pyre-unsafe
 
 
+import asyncio
+import importlib
+import re
 import sys
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from functools import lru_cache
 from string import ascii_letters
+from types import ModuleType
 from typing import Any, Dict, List, Optional
 
+import bunch
 import click
 from openr.py.openr.cli.utils import utils
 from openr.py.openr.cli.utils.commands import OpenrCtrlCmd
@@ -19,7 +25,106 @@ from openr.py.openr.utils import ipnetwork, printing
 from openr.thrift.KvStore.thrift_types import InitializationEvent
 from openr.thrift.OpenrCtrl.thrift_types import AdjacenciesFilter
 from openr.thrift.OpenrCtrlCpp.thrift_clients import OpenrCtrlCpp as OpenrCtrlCppClient
-from openr.thrift.Types.thrift_types import DumpLinksReply, InterfaceDetails
+from openr.thrift.Types.thrift_types import (
+    DumpLinksReply,
+    InterfaceDetails,
+    InterfaceInfo,
+)
+
+
+@lru_cache(maxsize=None)
+def _optional_module(name: str) -> ModuleType | None:
+    """
+    Import an optional accelerator on first use, None if it is not installed.
+    Deferred so that the other breeze commands don't pay for loading it
+    """
+
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+# Pre-rendered labels for the links table and its caption
+_OVERLOADED_STYLED: str = click.style("Overloaded", fg="red")
+_DOWN_STYLED: str = click.style("Down", fg="red")
+_OVERLOAD_YES_STYLED: str = click.style("YES", fg="red")
+_OVERLOAD_NO_STYLED: str = click.style("NO", fg="green")
+
+
+@lru_cache(maxsize=64)
+def _hold_styled(backoff_sec: int) -> str:
+    """Links table state of a flap-suppressed interface, shared by equal backoffs"""
+
+    return click.style(f"Hold ({backoff_sec} s)", fg="yellow")
+
+
+# inline global flags such as `(?i)`, which can't be scoped to one alternative
+_GLOBAL_FLAGS_RE: re.Pattern = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+def _never_match(string: str) -> bool:
+    return False
+
+
+# Regex syntax which hyperscan (PCRE dialect) and `re` read the same way:
+# ASCII literals, escaped punctuation, `.`, `^`, `|`, groups, plain bracket
+# classes and `*`, `+`, `?`, `{m}`, `{m,}`, `{m,n}` quantifiers. Anything else,
+# e.g. `{,n}`, `$`, `\Z` or POSIX classes, may differ and is left to `re`
+_HYPERSCAN_SAFE_RE: re.Pattern = re.compile(
+    r"(?:"
+    r"[A-Za-z0-9_\-/:@,=%#~<> ]"
+    r"|[.*+?|()^]"
+    r"|\\[.\-/\[\]()*+?|^${}\\]"
+    r"|\{\d+(?:,\d*)?\}"
+    r"|\[\^?(?:[A-Za-z0-9_\-/:@.]|\\[.\-\[\]\\^])+\]"
+    r")*"
+)
+
+
+def _is_hyperscan_safe(regex: str) -> bool:
+    if _HYPERSCAN_SAFE_RE.fullmatch(regex) is None:
+        return False
+    # `(?` opens extensions (inline flags, lookarounds, ...) in both dialects,
+    # only plain non-capturing groups are known to mean the same thing
+    return "(?" not in regex.replace("(?:", "")
+
+
+def _hyperscan_matcher(regexes: frozenset[str]) -> Callable[[str], bool] | None:
+    """
+    Compile regexes into a hyperscan block-mode database, matching all of them
+    in a single pass over the string. Returns None when hyperscan is not
+    installed, or when one of the regexes uses syntax outside of
+    `_HYPERSCAN_SAFE_RE` or is rejected by hyperscan
+    """
+
+    hyperscan = _optional_module("hyperscan")
+    if hyperscan is None or not all(_is_hyperscan_safe(regex) for regex in regexes):
+        return None
+
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[regex.encode() for regex in regexes],
+            # UTF8: `.` and negated classes consume a code point, as in `re`
+            flags=hyperscan.HS_FLAG_SINGLEMATCH
+            | hyperscan.HS_FLAG_ALLOWEMPTY
+            | hyperscan.HS_FLAG_UTF8,
+        )
+    except hyperscan.error:
+        return None
+
+    def matcher(string: str) -> bool:
+        matched = False
+
+        def on_match(*args) -> None:
+            nonlocal matched
+            matched = True
+
+        db.scan(string.encode(), match_event_handler=on_match)
+        return matched
+
+    return matcher
 
 
 def interface_key(interface: str) -> int:
@@ -53,24 +158,46 @@ class LMCmdBase(OpenrCtrlCmd):
     is spawn out of this.
     """
 
+    def __init__(self, cli_opts: bunch.Bunch | None = None) -> None:
+        super().__init__(cli_opts)
+        # DumpLinksReply cached per client, see `fetch_lm_links`
+        self._links: DumpLinksReply | None = None
+        self._links_client: OpenrCtrlCppClient.Async | None = None
+
+    async def fetch_lm_links(self, client: OpenrCtrlCppClient.Async) -> DumpLinksReply:
+        """
+        Fetch links from LinkMonitor, reusing the reply previously fetched over
+        the same client. Any call mutating link state must follow up with
+        `invalidate_lm_links`.
+        """
+
+        if self._links is None or self._links_client is not client:
+            self._links = await client.getInterfaces()
+            self._links_client = client
+        return self._links
+
+    def invalidate_lm_links(self) -> None:
+        self._links = None
+        self._links_client = None
+
     async def toggle_node_overload_bit(
         self, client: OpenrCtrlCppClient.Async, overload: bool, yes: bool = False
     ) -> None:
         """[Hard-Drain] Node level overload"""
 
-        links = await client.getInterfaces()
+        links = await self.fetch_lm_links(client)
         host = links.thisNodeName
-        print()
 
         if overload and links.isOverloaded:
-            print(f"Node {host} is already overloaded.\n")
+            print(f"\nNode {host} is already overloaded.\n")
             sys.exit(0)
 
         if not overload and not links.isOverloaded:
-            print(f"Node {host} is not overloaded.\n")
+            print(f"\nNode {host} is not overloaded.\n")
             sys.exit(0)
 
         action = "set overload bit" if overload else "unset overload bit"
+        print()
         if not utils.yesno(f"Are you sure to {action} for node {host} ?", yes):
             print()
             return
@@ -79,6 +206,7 @@ class LMCmdBase(OpenrCtrlCmd):
             await client.setNodeOverload()
         else:
             await client.unsetNodeOverload()
+        self.invalidate_lm_links()
 
         print(f"Successfully {action}..\n")
 
@@ -91,22 +219,23 @@ class LMCmdBase(OpenrCtrlCmd):
     ) -> None:
         """[Hard-Drain] Link level overload"""
 
-        links = await client.getInterfaces()
-        print()
+        links = await self.fetch_lm_links(client)
 
-        if interface not in links.interfaceDetails:
-            print(f"No such interface: {interface}")
+        details = links.interfaceDetails.get(interface)
+        if details is None:
+            print(f"\nNo such interface: {interface}")
             return
 
-        if overload and links.interfaceDetails[interface].isOverloaded:
-            print("Interface is already overloaded.\n")
+        if overload and details.isOverloaded:
+            print("\nInterface is already overloaded.\n")
             sys.exit(0)
 
-        if not overload and not links.interfaceDetails[interface].isOverloaded:
-            print("Interface is not overloaded.\n")
+        if not overload and not details.isOverloaded:
+            print("\nInterface is not overloaded.\n")
             sys.exit(0)
 
         action = "set overload bit" if overload else "unset overload bit"
+        print()
         question_str = "Are you sure to {} for interface {} ?"
         if not utils.yesno(question_str.format(action, interface), yes):
             print()
@@ -116,6 +245,7 @@ class LMCmdBase(OpenrCtrlCmd):
             await client.setInterfaceOverload(interface)
         else:
             await client.unsetInterfaceOverload(interface)
+        self.invalidate_lm_links()
 
         print(f"Successfully {action} for the interface.\n")
 
@@ -124,7 +254,7 @@ class LMCmdBase(OpenrCtrlCmd):
     ) -> None:
         """[Soft-Drain] Node level metric increment"""
 
-        links = await client.getInterfaces()
+        links = await self.fetch_lm_links(client)
         host = links.thisNodeName
 
         # ATTN:
@@ -151,6 +281,7 @@ class LMCmdBase(OpenrCtrlCmd):
             await client.setNodeInterfaceMetricIncrement(metric_inc)
         else:
             await client.unsetNodeInterfaceMetricIncrement()
+        self.invalidate_lm_links()
 
         print(f"Successfully {action} for node {host}.\n")
 
@@ -163,7 +294,7 @@ class LMCmdBase(OpenrCtrlCmd):
     ) -> None:
         """[Soft-Drain] Link level metric increment"""
 
-        links = await client.getInterfaces()
+        links = await self.fetch_lm_links(client)
         host = links.thisNodeName
 
         # ATTN:
@@ -175,35 +306,37 @@ class LMCmdBase(OpenrCtrlCmd):
             print(f"Can't set negative link metric increment on: {host}")
             sys.exit(0)
 
+        interface_details = []
         for interface in interfaces:
-            if interface not in links.interfaceDetails:
+            details = links.interfaceDetails.get(interface)
+            if details is None:
                 print(f"No such interface: {interface} on node: {host}")
                 sys.exit(0)
+            interface_details.append((interface, details))
 
         intefaces_to_process = []
+        noop_msgs = []
 
         # Get Confirmation
-        for interface in interfaces:
-            if (
-                metric_inc
-                and links.interfaceDetails[interface].linkMetricIncrementVal
-                == metric_inc
-            ):
-                print(
+        for interface, details in interface_details:
+            link_metric_inc = details.linkMetricIncrementVal
+            if metric_inc and link_metric_inc == metric_inc:
+                noop_msgs.append(
                     f"Link metric increment already set with: {metric_inc} for interface {interface}. No-op.\n"
                 )
                 continue
 
-            if (
-                not metric_inc
-                and links.interfaceDetails[interface].linkMetricIncrementVal == 0
-            ):
-                print(
+            if not metric_inc and link_metric_inc == 0:
+                noop_msgs.append(
                     f"No link metric increment has been set on: {interface}. No-op.\n"
                 )
                 continue
             intefaces_to_process.append(interface)
 
+        # Report skipped interfaces in one write, ahead of the prompt
+        if noop_msgs:
+            print("\n".join(noop_msgs))
+
         action = "set link metric inc" if metric_inc else "unset link metric inc"
         question_str = "Are you sure to {} for link {} on node {} ?"
         if not utils.yesno(
@@ -217,6 +350,7 @@ class LMCmdBase(OpenrCtrlCmd):
             )
         else:
             await client.unsetInterfaceMetricIncrementMulti(intefaces_to_process)
+        self.invalidate_lm_links()
 
         print(
             f"Success {len(intefaces_to_process)}, Skipped {len(interfaces) - len(intefaces_to_process)}"
@@ -231,62 +365,74 @@ class LMCmdBase(OpenrCtrlCmd):
         2) metricOverride set -> return True/False;
         """
         metricOverride = links.interfaceDetails[interface].metricOverride
-        if not metricOverride:
-            return None
-        return metricOverride == metric
-
-    def interface_info_to_dict(self, interface_info):
-        def _update(interface_info_dict, interface_info):
-            interface_info_dict.update(
-                {
-                    "networks": [
-                        ipnetwork.sprint_prefix(prefix)
-                        for prefix in interface_info.networks
-                    ]
-                }
-            )
-
-        return utils.thrift_to_dict(interface_info, _update)
-
-    def interface_details_to_dict(self, interface_details):
-        def _update(interface_details_dict, interface_details):
-            interface_details_dict.update(
-                {"info": self.interface_info_to_dict(interface_details.info)}
-            )
-
-        return utils.thrift_to_dict(interface_details, _update)
+        return metricOverride == metric if metricOverride else None
+
+    # NOTE: the *_to_dict helpers below spell out the fields of InterfaceInfo,
+    # InterfaceDetails and DumpLinksReply instead of walking them through
+    # `utils.thrift_to_dict`. Keep them in sync with openr/if/Types.thrift.
+
+    def interface_info_to_dict(self, interface_info: InterfaceInfo) -> dict[str, Any]:
+        return {
+            "isUp": interface_info.isUp,
+            "ifIndex": interface_info.ifIndex,
+            "networks": [
+                ipnetwork.sprint_prefix(prefix) for prefix in interface_info.networks
+            ],
+        }
 
-    def links_to_dict(self, links):
-        def _update(links_dict, links):
-            links_dict.update(
-                {
-                    "interfaceDetails": {
-                        k: self.interface_details_to_dict(v)
-                        for k, v in links.interfaceDetails.items()
-                    }
-                }
-            )
-            del links_dict["thisNodeName"]
+    def interface_details_to_dict(
+        self, interface_details: InterfaceDetails
+    ) -> dict[str, Any]:
+        return {
+            "info": self.interface_info_to_dict(interface_details.info),
+            "isOverloaded": interface_details.isOverloaded,
+            "metricOverride": interface_details.metricOverride,
+            "linkFlapBackOffMs": interface_details.linkFlapBackOffMs,
+            "linkMetricIncrementVal": interface_details.linkMetricIncrementVal,
+        }
 
-        return utils.thrift_to_dict(links, _update)
+    def links_to_dict(self, links: DumpLinksReply) -> dict[str, Any]:
+        # thisNodeName is deprecated and used as the key by `print_links_json`
+        return {
+            "nodeMetricIncrementVal": links.nodeMetricIncrementVal,
+            "isOverloaded": links.isOverloaded,
+            "interfaceDetails": {
+                k: self.interface_details_to_dict(v)
+                for k, v in links.interfaceDetails.items()
+            },
+        }
 
     def print_links_json(self, links):
         links_dict = {links.thisNodeName: self.links_to_dict(links)}
-        print(utils.json_dumps(links_dict))
+        orjson = _optional_module("orjson")
+        if orjson is not None:
+            # Same layout as `utils.json_dumps`, encoded natively by orjson
+            links_json = orjson.dumps(
+                links_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+            ).decode("utf-8")
+        else:
+            links_json = utils.json_dumps(links_dict)
+        print(links_json)
 
     @classmethod
     def build_table_rows(
         cls, interfaces: dict[str, InterfaceDetails]
     ) -> list[list[str]]:
-        rows = []
-        for interface in sorted(interfaces, key=interface_key):
-            details = interfaces[interface]
-            row = cls.build_table_row(interface, details)
-            rows.append(row)
-        return rows
+        # addresses such as link-locals repeat across rows; format them once
+        addr_cache: dict[bytes, str] = {}
+        # sort (name, details) pairs so each row skips a lookup into interfaces
+        return [
+            cls.build_table_row(interface, details, addr_cache)
+            for interface, details in sorted(
+                interfaces.items(), key=lambda item: interface_key(item[0])
+            )
+        ]
 
     @staticmethod
-    def build_table_row(k: str, v: InterfaceDetails) -> list[Any]:
+    def build_table_row(
+        k: str, v: InterfaceDetails, addr_cache: dict[bytes, str] | None = None
+    ) -> list[Any]:
+        is_color = utils.is_color_output_supported()
         metric_override = ""
         if v.metricOverride:
             # [TO BE DEPRECATED]
@@ -294,32 +440,23 @@ class LMCmdBase(OpenrCtrlCmd):
         if v.linkMetricIncrementVal > 0:
             metric_override = v.linkMetricIncrementVal
         if v.isOverloaded:
-            metric_override = (
-                click.style("Overloaded", fg="red")
-                if utils.is_color_output_supported()
-                else "Overloaded"
-            )
-        if v.info.isUp:
-            backoff_sec = int(
-                (v.linkFlapBackOffMs if v.linkFlapBackOffMs else 0) / 1000
-            )
+            metric_override = _OVERLOADED_STYLED if is_color else "Overloaded"
+        info = v.info
+        if info.isUp:
+            backoff_sec = int((v.linkFlapBackOffMs or 0) / 1000)
             if backoff_sec == 0:
                 state = "Up"
-            elif not utils.is_color_output_supported():
+            elif not is_color:
                 state = backoff_sec
             else:
-                state = click.style(f"Hold ({backoff_sec} s)", fg="yellow")
+                state = _hold_styled(backoff_sec)
         else:
-            state = (
-                click.style("Down", fg="red")
-                if utils.is_color_output_supported()
-                else "Down"
+            state = _DOWN_STYLED if is_color else "Down"
+        addresses = " ".join(
+            ipnetwork.sprint_addrs(
+                (prefix.prefixAddress.addr for prefix in info.networks), addr_cache
             )
-        addrs = []
-        for prefix in v.info.networks:
-            addrStr = ipnetwork.sprint_addr(prefix.prefixAddress.addr)
-            addrs.append(addrStr)
-        addresses = " ".join(addrs)
+        )
         row = [k, state, metric_override, addresses]
         return row
 
@@ -479,17 +616,25 @@ class LMAdjCmd(LMCmdBase):
         area_filters = AdjacenciesFilter(selectAreas=set(areas))
         adj_dbs = await client.getLinkMonitorAdjacenciesFiltered(area_filters)
 
+        if json:
+            # One document per area, handed lazily to the buffered stdout so
+            # only a single area's dict and document are alive at a time
+            sys.stdout.writelines(
+                utils.json_dumps(self._adj_db_to_dict(adj_db, nodes)) + "\n"
+                for adj_db in adj_dbs
+            )
+            return
+
         for adj_db in adj_dbs:
-            if adj_db and adj_db.area and not json:
+            if adj_db and adj_db.area:
                 click.secho(f"Area: {adj_db.area}", bold=True)
-            # adj_db is built with ONLY one single (node, adjDb). Ignpre bidir option
-            adjs_map = utils.adj_dbs_to_dict(
-                {adj_db.thisNodeName: adj_db}, nodes, False, self.iter_dbs
-            )
-            if json:
-                utils.print_json(adjs_map)
-            else:
-                utils.print_adjs_table(adjs_map, None, None)
+            utils.print_adjs_table(self._adj_db_to_dict(adj_db, nodes), None, None)
+
+    def _adj_db_to_dict(self, adj_db: Any, nodes: set) -> dict[str, Any]:
+        # adj_db is built with ONLY one single (node, adjDb). Ignore bidir option
+        return utils.adj_dbs_to_dict(
+            {adj_db.thisNodeName: adj_db}, nodes, False, self.iter_dbs
+        )
 
 
 class LMLinksCmd(LMCmdBase):
@@ -502,7 +647,7 @@ class LMLinksCmd(LMCmdBase):
         *args,
         **kwargs,
     ) -> None:
-        links = await client.getInterfaces()
+        links = await self.fetch_lm_links(client)
         if only_suppressed:
             links = links(
                 interfaceDetails={
@@ -518,10 +663,8 @@ class LMLinksCmd(LMCmdBase):
             node_metric_inc_status = None
             if utils.is_color_output_supported():
                 # [Hard-Drain]
-                overload_color = "red" if links.isOverloaded else "green"
-                overload_status = click.style(
-                    "{}".format("YES" if links.isOverloaded else "NO"),
-                    fg=overload_color,
+                overload_status = (
+                    _OVERLOAD_YES_STYLED if links.isOverloaded else _OVERLOAD_NO_STYLED
                 )
                 # [Soft-Drain]
                 node_metric_inc_color = (
@@ -542,6 +685,11 @@ class LMLinksCmd(LMCmdBase):
 
 
 class LMValidateCmd(LMCmdBase):
+    def __init__(self, cli_opts: bunch.Bunch | None = None) -> None:
+        super().__init__(cli_opts)
+        # compiled matchers keyed by the set of regexes they union
+        self._regex_cache: dict[frozenset[str], Callable[[str], Any]] = {}
+
     async def _run(
         self,
         client: OpenrCtrlCppClient.Async,
@@ -550,10 +698,13 @@ class LMValidateCmd(LMCmdBase):
     ) -> bool:
         is_pass = True
 
-        # Get Data
-        links = await client.getInterfaces()
-        initialization_events = await client.getInitializationEvents()
-        openr_config = await client.getRunningConfigThrift()
+        # Get Data. The requests are independent, so issue them concurrently
+        # over the (multiplexed) client rather than paying three round trips
+        links, initialization_events, openr_config = await asyncio.gather(
+            self.fetch_lm_links(client),
+            client.getInitializationEvents(),
+            client.getRunningConfigThrift(),
+        )
 
         # Run the validation checks
         init_is_pass, init_err_msg_str = self.validate_init_event(
@@ -588,47 +739,69 @@ class LMValidateCmd(LMCmdBase):
         Returns a dictionary interface : interfaceDetails of the invalid interfaces
         """
 
-        interfaces = list(links.interfaceDetails.keys())
-        invalid_interfaces = set()
+        invalid_interfaces = []
 
-        for interface in interfaces:
+        # Compile each area's regexes once instead of per interface
+        area_matchers = [
+            (
+                self._regex_matcher(area.include_interface_regexes),
+                self._regex_matcher(area.exclude_interface_regexes),
+                self._regex_matcher(area.redistribute_interface_regexes),
+            )
+            for area in areas
+        ]
+
+        for interface, details in links.interfaceDetails.items():
             # The interface must match the regexes of atleast one area to pass
             passes_regex_check = False
 
-            for area in areas:
-                incl_regexes = area.include_interface_regexes
-                excl_regexes = area.exclude_interface_regexes
-                redistr_regexes = area.redistribute_interface_regexes
-
-                passes_incl_regexes = self.validate_regexes(
-                    incl_regexes,
-                    [interface],
-                    True,  # expect at least one regex match
-                )
-                passes_excl_regexes = self.validate_regexes(
-                    excl_regexes,
-                    [interface],
-                    False,  # expect no regex match
-                )
-                passes_redistr_regexes = self.validate_regexes(
-                    redistr_regexes, [interface], True
-                )
-
-                if (
-                    passes_incl_regexes or passes_redistr_regexes
-                ) and passes_excl_regexes:
+            for incl_matcher, excl_matcher, redistr_matcher in area_matchers:
+                # Exclude lists are typically short, so reject on them first.
+                # Redistribute regexes only matter if include regexes miss
+                if excl_matcher(interface):
+                    continue
+                if incl_matcher(interface) or redistr_matcher(interface):
                     passes_regex_check = True
                     break
 
             if not passes_regex_check:
-                invalid_interfaces.add(interface)
+                invalid_interfaces.append((interface, details))
 
-        invalid_interface_dict = {
-            interface: links.interfaceDetails[interface]
-            for interface in invalid_interfaces
-        }
+        return dict(invalid_interfaces)
+
+    def _regex_matcher(self, regexes: Sequence[str] | None) -> Callable[[str], Any]:
+        """
+        Returns a predicate, truthy when a string matches atleast one of the
+        regexes. The regexes are compiled once, into a hyperscan database when
+        available or else a single alternation when joining them is safe, and
+        cached on the command.
+        """
+
+        key = frozenset(regexes or ())
+        matcher = self._regex_cache.get(key)
+        if matcher is not None:
+            return matcher
+
+        # compile with `re` regardless, so that invalid regexes raise as before
+        patterns = [re.compile(regex) for regex in key]
+        if not key:
+            matcher = _never_match
+        else:
+            matcher = _hyperscan_matcher(key)
+        if matcher is None:
+            if all(
+                pattern.groups == 0 and not _GLOBAL_FLAGS_RE.search(pattern.pattern)
+                for pattern in patterns
+            ):
+                matcher = re.compile("|".join(f"(?:{regex})" for regex in key)).search
+            else:
+                # groups (hence backreferences) get renumbered and inline global
+                # flags apply to every alternative once joined; match one by one
+                def matcher(string: str) -> bool:
+                    return any(pattern.search(string) for pattern in patterns)
 
-        return invalid_interface_dict
+        self._regex_cache[key] = matcher
+        return matcher
 
     def _print_interface_validation_info(
         self,
@@ -8,6 +8,7 @@
 
 
 from openr.thrift.Network.thrift_types import BinaryAddress, IpPrefix
+from openr.thrift.OpenrConfig.thrift_types import AreaConfig
 from openr.thrift.Types.thrift_types import (
     DumpLinksReply,
     InterfaceDetails,
@@ -80,3 +81,29 @@ lo           Up                           127.0.0.1 10.6.9.2 fd00:2:: ::1
 LM_LINK_EXPECTED_STDOUT_RIGHT0 = """
 right0       Up                           fd00::2 fe80::50ef:deff:fe4c:d4f6
 """
+
+LM_LINK_EXPECTED_JSON_RIGHT0 = {
+    "info": {
+        "isUp": True,
+        "ifIndex": 63,
+        "networks": ["fd00::2/64", "fe80::50ef:deff:fe4c:d4f6/64"],
+    },
+    "isOverloaded": False,
+    "metricOverride": None,
+    "linkFlapBackOffMs": None,
+    "linkMetricIncrementVal": 0,
+}
+
+LM_AREA_INCLUDE_LO = AreaConfig(
+    area_id="include-lo-areaId", include_interface_regexes=["lo"]
+)
+
+LM_AREA_INCLUDE_ALL = AreaConfig(
+    area_id="include-all-areaId", include_interface_regexes=["lo", "right.*"]
+)
+
+LM_AREA_REDISTRIBUTE_EXCLUDE_RIGHT = AreaConfig(
+    area_id="redistribute-exclude-right-areaId",
+    redistribute_interface_regexes=["right.*"],
+    exclude_interface_regexes=["right0"],
+)
@@ -6,11 +6,16 @@
 
 # pyre-strict
 
+import json
+import re
+from types import SimpleNamespace
+from typing import Callable
 from unittest.mock import AsyncMock, patch
 
 from click.testing import CliRunner
 from later.unittest import TestCase
 from openr.py.openr.cli.clis import lm
+from openr.py.openr.cli.commands import lm as lm_cmd
 from openr.py.openr.cli.tests import helpers
 
 
@@ -18,12 +23,43 @@ BASE_MODULE: str = lm.__name__
 BASE_CMD_MODULE = "openr.py.openr.cli.commands.lm"
 
 from .fixtures import (
+    LM_AREA_INCLUDE_ALL,
+    LM_AREA_INCLUDE_LO,
+    LM_AREA_REDISTRIBUTE_EXCLUDE_RIGHT,
+    LM_LINK_EXPECTED_JSON_RIGHT0,
     LM_LINK_EXPECTED_STDOUT_L0,
     LM_LINK_EXPECTED_STDOUT_RIGHT0,
     LM_LINKS_OPENR_RIGHT_OK,
 )
 
 
+class FakeHyperscanDatabase:
+    """
+    Stands in for hyperscan.Database, scanning with `re` and recording the
+    expressions compiled into it
+    """
+
+    compiled: list[list[bytes]] = []
+
+    def compile(self, expressions: list[bytes], flags: int) -> None:
+        self.compiled.append(expressions)
+        self._patterns: list[re.Pattern[bytes]] = [re.compile(e) for e in expressions]
+
+    def scan(self, data: bytes, match_event_handler: Callable[..., None]) -> None:
+        for i, pattern in enumerate(self._patterns):
+            if pattern.search(data):
+                match_event_handler(i, 0, 0, 0, None)
+
+
+FAKE_HYPERSCAN = SimpleNamespace(
+    Database=FakeHyperscanDatabase,
+    HS_FLAG_SINGLEMATCH=1,
+    HS_FLAG_ALLOWEMPTY=2,
+    HS_FLAG_UTF8=4,
+    error=Exception,
+)
+
+
 class CliLmTests(TestCase):
     def setUp(self) -> None:
         self.runner = CliRunner()
@@ -52,3 +88,68 @@ class CliLmTests(TestCase):
             -1, invoked_return.stdout.find(LM_LINK_EXPECTED_STDOUT_RIGHT0)
         )
         self.assertNotEqual(-1, invoked_return.stdout.find(LM_LINK_EXPECTED_STDOUT_L0))
+
+    @patch(helpers.COMMANDS_GET_OPENR_CTRL_CPP_CLIENT)
+    def test_lm_links_json(self, mocked_openr_client: AsyncMock) -> None:
+        mocked_returned_connection = helpers.get_enter_thrift_asyncmock(
+            mocked_openr_client
+        )
+        mocked_returned_connection.getInterfaces.return_value = LM_LINKS_OPENR_RIGHT_OK
+        invoked_return = self.runner.invoke(
+            lm.LMLinksCli.links,
+            ["--json"],
+            catch_exceptions=False,
+        )
+        self.assertEqual(0, invoked_return.exit_code)
+        links_dict = json.loads(invoked_return.stdout)["openr-right"]
+        self.assertEqual(0, links_dict["nodeMetricIncrementVal"])
+        self.assertFalse(links_dict["isOverloaded"])
+        self.assertEqual(["lo", "right0"], sorted(links_dict["interfaceDetails"]))
+        self.assertEqual(
+            LM_LINK_EXPECTED_JSON_RIGHT0, links_dict["interfaceDetails"]["right0"]
+        )
+
+    def test_lm_validate_interface_regex(self) -> None:
+        cmd = lm_cmd.LMValidateCmd()
+
+        invalid_interfaces = cmd._validate_interface_regex(
+            LM_LINKS_OPENR_RIGHT_OK, [LM_AREA_INCLUDE_LO]
+        )
+        self.assertEqual(["right0"], list(invalid_interfaces))
+
+        # right0 matches the redistribute regexes but is excluded in that area
+        invalid_interfaces = cmd._validate_interface_regex(
+            LM_LINKS_OPENR_RIGHT_OK,
+            [LM_AREA_INCLUDE_LO, LM_AREA_REDISTRIBUTE_EXCLUDE_RIGHT],
+        )
+        self.assertEqual(["right0"], list(invalid_interfaces))
+
+        invalid_interfaces = cmd._validate_interface_regex(
+            LM_LINKS_OPENR_RIGHT_OK, [LM_AREA_INCLUDE_ALL]
+        )
+        self.assertEqual({}, invalid_interfaces)
+
+        # Joined into one alternation, the \1 of the second regex would refer
+        # to the group of the first one and "xx" would no longer match
+        matcher = cmd._regex_matcher(["(e)\\1th", "(x)\\1"])
+        self.assertTrue(matcher("xx"))
+        self.assertTrue(matcher("eeth0"))
+        self.assertFalse(matcher("right0"))
+
+    @patch(f"{BASE_CMD_MODULE}._optional_module", return_value=FAKE_HYPERSCAN)
+    def test_lm_validate_interface_regex_hyperscan(self, _: object) -> None:
+        FakeHyperscanDatabase.compiled.clear()
+
+        matcher = lm_cmd.LMValidateCmd()._regex_matcher(["eth[0-9]+"])
+        self.assertEqual([[b"eth[0-9]+"]], FakeHyperscanDatabase.compiled)
+        self.assertTrue(matcher("eth0"))
+        self.assertFalse(matcher("lo"))
+
+        # hyperscan reads `{,2}` as literal text, where `re` repeats 0 to 2
+        # times; such regexes must be left to `re`
+        FakeHyperscanDatabase.compiled.clear()
+        matcher = lm_cmd.LMValidateCmd()._regex_matcher(["et{,2}h"])
+        self.assertEqual([], FakeHyperscanDatabase.compiled)
+        self.assertTrue(matcher("etth"))
+        self.assertTrue(matcher("eh"))
+        self.assertFalse(matcher("et{,2}h"))
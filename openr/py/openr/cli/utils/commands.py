@@ -19,6 +19,7 @@ from openr.py.openr.clients.openr_client import get_openr_ctrl_cpp_client
 from openr.py.openr.utils import printing
 from openr.py.openr.utils.consts import Consts
 from openr.thrift.KvStore.thrift_types import InitializationEvent, KeyDumpParams, Value
+from openr.thrift.OpenrCtrlCpp.thrift_clients import OpenrCtrlCpp as OpenrCtrlCppClient
 from thrift.python.client import ClientType
 
 
@@ -39,6 +40,8 @@ class OpenrCtrlCmd:
             cli_opts.get("fib_agent_port") or Consts.DEFAULT_FIB_AGENT_PORT
         )
         self._config = None
+        # client of the in-flight `run`, shared with helpers issuing extra RPCs
+        self._client: OpenrCtrlCppClient.Async | None = None
 
     def run(self, *args, **kwargs) -> int:
         """
@@ -52,7 +55,11 @@ class OpenrCtrlCmd:
                 self.cli_opts,
                 client_type=ClientType.THRIFT_ROCKET_CLIENT_TYPE,
             ) as client:
-                ret_val = await self._run(client, *args, **kwargs)
+                self._client = client
+                try:
+                    ret_val = await self._run(client, *args, **kwargs)
+                finally:
+                    self._client = None
             if ret_val is None:
                 ret_val = 0
             return ret_val
@@ -73,9 +80,15 @@ class OpenrCtrlCmd:
 
     async def _get_config(self) -> dict[str, Any]:
         if self._config is None:
-            async with get_openr_ctrl_cpp_client(self.host, self.cli_opts) as client:
-                resp = await client.getRunningConfig()
-                self._config = json.loads(resp)
+            if self._client is not None:
+                # reuse the connection opened by `run` instead of dialing again
+                resp = await self._client.getRunningConfig()
+            else:
+                async with get_openr_ctrl_cpp_client(
+                    self.host, self.cli_opts
+                ) as client:
+                    resp = await client.getRunningConfig()
+            self._config = json.loads(resp)
         return self._config
 
     def iter_dbs(
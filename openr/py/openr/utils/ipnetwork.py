@@ -9,6 +9,7 @@
 
 import ipaddress
 import socket
+from collections.abc import Iterable
 from typing import List, Optional, Union
 
 from openr.Network import ttypes as network_types
@@ -32,9 +33,39 @@ def sprint_addr(addr: bytes) -> str:
     if not len(addr) or not addr:
         return ""
 
+    # inet_ntop renders v4 exactly like ipaddress without building an object.
+    # v6 stays on ipaddress, whose formatting of v4-mapped addresses differs
+    if len(addr) == 4:
+        return socket.inet_ntop(socket.AF_INET, addr)
+
     return str(ipaddress.ip_address(addr))
 
 
+def sprint_addrs(
+    addrs: Iterable[bytes], cache: dict[bytes, str] | None = None
+) -> list[str]:
+    """
+    binary ip addrs -> strings, formatting each distinct address only once
+
+    :param addrs: binary ip addresses
+    :param cache: optional binary -> string map to share across calls, e.g.
+                  between rows of a table where addresses repeat
+
+    :returns: string representation of each address, in order
+    """
+
+    if cache is None:
+        cache = {}
+
+    addr_strs = []
+    for addr in addrs:
+        addr_str = cache.get(addr)
+        if addr_str is None:
+            addr_str = cache[addr] = sprint_addr(addr)
+        addr_strs.append(addr_str)
+    return addr_strs
+
+
 def sprint_prefix(
     prefix: IpPrefix | network_types_py3.IpPrefix | network_types.IpPrefix,
 ) -> str: